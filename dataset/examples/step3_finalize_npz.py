@@ -60,18 +60,12 @@ def run_step3_finalize():
         ref_bvh_path = os.path.join(dir_mb_output, mb_files[0])
 
     # --- Execution ---
-    print(" -> Standardizing SMPL BVH (removing T-pose, fixing channels)...")
-    smpl_bvh_to_smpl_npz.build_smpl_bvh(
+    print(" -> Standardizing SMPL BVH (removing T-pose, fixing channels) and converting to NPZ...")
+    smpl_bvh_to_smpl_npz.build_smpl_bvh_and_npz(
         root=work_dir,
         smpl_t_bvh_path=ref_bvh_path,
         input_bvh_dir="bvhForC/output",  # Relative to work_dir
         out_bvh_smpl_dir="bvhSMPL",      # Relative to work_dir
-    )
-    
-    print(" -> Converting to NPZ...")
-    smpl_bvh_to_smpl_npz.build_smpl_npz(
-        root=work_dir,
-        in_bvh_smpl_dir="bvhSMPL",
         out_npz_dir="npz",
         # Convert root translation from centimeters to meters before saving NPZ.
         # If your BVH translation unit is not cm, adjust this (e.g., mm->m: 0.001).
@@ -19,6 +19,9 @@ Example:
         --dst-raw path/to/bvh \\
         --dst-for-mb path/to/bvhForC
 
+Add `--link` to hard-link the renamed raw clips instead of copying them
+when `--src` and `--dst-raw` are on the same filesystem.
+
 The resulting folders correspond to:
 
 - `bvh/`     – renamed raw BVH clips (no T-pose frame prepended),
@@ -29,7 +32,8 @@ The resulting folders correspond to:
 import argparse
 import os
 import shutil
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 import numpy as np
 
@@ -41,22 +45,92 @@ if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 
 import bvh  # type: ignore
+from parallel import add_max_workers_argument, map_files  # type: ignore
+
+
+def _fast_copy(src: str, dst: str) -> None:
+    """Copy file contents and permission bits, like `shutil.copy`.
+
+    `shutil.copy` already copies in the kernel on Linux and macOS; on
+    Windows the copy is delegated to `CopyFileW` instead of a buffered
+    read/write loop.
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        if not ctypes.windll.kernel32.CopyFileW(src, dst, False):
+            raise ctypes.WinError()
+        return
+
+    shutil.copy(src, dst)
+
+
+def _is_same_file(src: str, dst: str) -> bool:
+    """Whether dst already exists and is the same file (inode) as src."""
+    try:
+        return os.path.samefile(src, dst)
+    except FileNotFoundError:
+        return False
+
+
+def _copy_over(src: str, dst: str) -> None:
+    """Copy src to dst without ever opening an existing dst for writing.
+
+    The copy goes to a temporary file next to dst, which then replaces the
+    dst directory entry (see `bvh.atomic_path`). An existing dst that is a
+    hard link to src or to another file (e.g. from an earlier `--link`
+    run) is therefore never written through, and ends up as an
+    independent file.
+    """
+    with bvh.atomic_path(dst) as tmp_path:
+        _fast_copy(src, tmp_path)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard-link src to dst, falling back to `_copy_over`.
+
+    A hard link moves no data at all. It is not possible across
+    filesystems (or on some filesystems at all), in which case the file is
+    copied instead. A dst already linked to src by a previous run is left
+    alone. Otherwise the link is made under a temporary name that then
+    replaces dst, so an existing dst is never written to, and is kept if
+    both the link and the copy fail.
+    """
+    if _is_same_file(src, dst):
+        return
+    try:
+        with bvh.atomic_path(dst) as tmp_path:
+            os.link(src, tmp_path)
+    except OSError:
+        _copy_over(src, dst)
 
 
 def list_bvh_files(src: str) -> List[str]:
-    """List BVH files in a directory (sorted lexicographically)."""
-    return sorted(
-        [
-            f
-            for f in os.listdir(src)
-            if os.path.isfile(os.path.join(src, f)) and f.lower().endswith(".bvh")
-        ]
-    )
+    """List BVH files in a directory (sorted lexicographically).
 
+    macOS resource-fork files ("._*") are skipped.
+    """
+    with os.scandir(src) as it:
+        return sorted(
+            e.name
+            for e in it
+            if e.is_file()
+            and e.name.lower().endswith(".bvh")
+            and not e.name.startswith("._")
+        )
 
-def copy_and_rename(src_dir: str, dst_raw_dir: str) -> List[str]:
+
+def copy_and_rename(src_dir: str, dst_raw_dir: str, link: bool = False) -> List[str]:
     """Copy BVH files from src_dir into dst_raw_dir with sequential names.
 
+    If `link` is True, the renamed files are hard links to the sources when
+    both directories are on the same filesystem (falling back to a copy
+    otherwise). Hard-linked files share their contents with the sources,
+    so only use this when the outputs are not modified in place. Existing
+    outputs are replaced rather than overwritten, so re-running (with or
+    without `link`) never changes the sources, and re-running without
+    `link` turns earlier hard links back into independent copies.
+
     Returns
     -------
     dst_paths : list of str
@@ -66,48 +140,72 @@ def copy_and_rename(src_dir: str, dst_raw_dir: str) -> List[str]:
 
     src_files = list_bvh_files(src_dir)
     dst_paths: List[str] = []
+    copy_src: List[str] = []
+    copy_dst: List[str] = []
 
     for idx, fname in enumerate(src_files, start=1):
         new_name = f"clip_{idx:03d}.bvh"
         src_path = os.path.join(src_dir, fname)
         dst_path = os.path.join(dst_raw_dir, new_name)
-        
+
         # Avoid copying if source and destination are the same file
         if os.path.abspath(src_path) != os.path.abspath(dst_path):
-            shutil.copy(src_path, dst_path)
-            
+            copy_src.append(src_path)
+            copy_dst.append(dst_path)
+
         dst_paths.append(dst_path)
 
+    # Copies are I/O-bound, so run several at once to keep the disk busy
+    copy_fn = _link_or_copy if link else _copy_over
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4)) as executor:
+        list(executor.map(copy_fn, copy_src, copy_dst))
+
     return dst_paths
 
 
-def prepend_tpose_frame(bvh_paths: List[str], dst_for_mb_dir: str) -> None:
-    """For each BVH, prepend a single T-pose frame and save to dst_for_mb_dir.
+def _process_one(src_path: str, dst_for_mb_dir: str) -> None:
+    """Prepend a T-pose frame to a single BVH clip (see `prepend_tpose_frame`).
 
-    The T-pose frame is constructed by:
-    - copying the original first frame's Y translation (root height),
-    - setting all other channels to zero.
+    Kept at module level so that it can be dispatched to worker processes.
     """
-    os.makedirs(dst_for_mb_dir, exist_ok=True)
+    data, fs, header = bvh.bvhreader(src_path)
+
+    if data.ndim != 2 or data.shape[0] < 1:
+        raise ValueError(f"Unexpected BVH data shape for {src_path}: {data.shape}")
+
+    # Allocate the output once and fill it in place: row 0 is the T-pose
+    # frame, the remaining rows are the original motion.
+    data_new = np.empty((data.shape[0] + 1, data.shape[1]), dtype=data.dtype)
+    data_new[1:] = data
+    data_new[0] = 0.0
+
+    # Preserve root Y translation so the puppet stays at the same height.
+    if data.shape[1] >= 2:
+        data_new[0, 1] = data[0, 1]
 
-    for src_path in bvh_paths:
-        data, fs, header = bvh.bvhreader(src_path)
+    base_name = os.path.splitext(os.path.basename(src_path))[0]
+    out_name = os.path.join(dst_for_mb_dir, base_name)
+    bvh.bvhoutput(data_new, fs, out_name, header)
 
-        if data.ndim != 2 or data.shape[0] < 1:
-            raise ValueError(f"Unexpected BVH data shape for {src_path}: {data.shape}")
 
-        first_frame = data[0]
-        tpose_frame = np.zeros_like(first_frame)[None, :]
+def prepend_tpose_frame(
+    bvh_paths: List[str],
+    dst_for_mb_dir: str,
+    max_workers: Optional[int] = None,
+) -> None:
+    """For each BVH, prepend a single T-pose frame and save to dst_for_mb_dir.
 
-        # Preserve root Y translation so the puppet stays at the same height.
-        if first_frame.shape[0] >= 2:
-            tpose_frame[0, 1] = first_frame[1]
+    The T-pose frame is constructed by:
+    - copying the original first frame's Y translation (root height),
+    - setting all other channels to zero.
 
-        data_new = np.concatenate([tpose_frame, data], axis=0)
+    Clips are independent, so they are processed in a pool of worker
+    processes (BVH parsing is CPU-bound Python work). `max_workers`
+    defaults to the number of CPUs; use 1 to process serially.
+    """
+    os.makedirs(dst_for_mb_dir, exist_ok=True)
 
-        base_name = os.path.splitext(os.path.basename(src_path))[0]
-        out_name = os.path.join(dst_for_mb_dir, base_name)
-        bvh.bvhoutput(data_new, fs, out_name, header)
+    map_files(_process_one, bvh_paths, max_workers, dst_for_mb_dir)
 
 
 def main():
@@ -136,14 +234,24 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help=(
+            "Hard-link renamed raw clips to the sources instead of copying "
+            "them (falls back to copying across filesystems)."
+        ),
+    )
+    add_max_workers_argument(parser)
+
     args = parser.parse_args()
 
     src_dir = os.path.abspath(args.src)
     dst_raw_dir = os.path.abspath(args.dst_raw)
     dst_for_mb_dir = os.path.abspath(args.dst_for_mb)
 
-    bvh_paths = copy_and_rename(src_dir, dst_raw_dir)
-    prepend_tpose_frame(bvh_paths, dst_for_mb_dir)
+    bvh_paths = copy_and_rename(src_dir, dst_raw_dir, link=args.link)
+    prepend_tpose_frame(bvh_paths, dst_for_mb_dir, max_workers=args.max_workers)
 
     print(f"Copied and renamed {len(bvh_paths)} BVH files into: {dst_raw_dir}")
     print(
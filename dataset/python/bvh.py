@@ -13,21 +13,58 @@ BVH features needed in this project:
 
 The API is compatible with the original scripts:
 
-- bvhreader(path) -> (data, frame_time, header_lines)
+- bvhreader(path, dtype=float) -> (data, frame_time, header_lines)
 - bvhoutput(data, frame_time, name_without_ext, header_lines)
 - errc / errb for fixing large Euler angle jumps.
+
+It also holds `atomic_path` / `atomic_open`, used by the dataset scripts
+so that an interrupted run never leaves a truncated output file behind.
 """
 
+import contextlib
+import os
+
 import numpy as np
 
 
-def bvhreader(path):
+@contextlib.contextmanager
+def atomic_path(path):
+    """Yield a temporary path next to `path`, moved over `path` on success.
+
+    The temporary name is `<path>.<pid>.tmp`; a stale one left by an
+    interrupted run is removed first, and it is removed again if the body
+    raises, in which case an existing `path` is left untouched.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="wb", buffering=-1):
+    """Open a file for writing through `atomic_path`."""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, buffering=buffering) as f:
+            yield f
+
+
+def bvhreader(path, dtype=float):
     """Read a BVH file.
 
     Parameters
     ----------
     path : str
         Path to a `.bvh` file.
+    dtype : data-type, optional
+        dtype of the returned motion data, by default float64. Analysis
+        code that only reads the data can pass np.float32 to halve memory.
 
     Returns
     -------
@@ -39,32 +76,26 @@ def bvhreader(path):
         Lines from the start of the file up to (and including) 'MOTION' and
         'Frames' / 'Frame Time' lines, which can be reused when writing out.
     """
+    header_lines = []
     with open(path) as f:
-        lines = f.readlines()
-
-    # Find the "MOTION" line that separates hierarchy and data
-    data_start_idx = None
-    for i, line in enumerate(lines):
-        if line.strip() == "MOTION":
-            data_start_idx = i
-            break
-
-    if data_start_idx is None:
-        raise ValueError(f"No 'MOTION' section found in BVH file: {path}")
+        # Collect the hierarchy up to the "MOTION" line that separates
+        # hierarchy and data
+        for line in f:
+            header_lines.append(line)
+            if line.strip() == "MOTION":
+                break
+        else:
+            raise ValueError(f"No 'MOTION' section found in BVH file: {path}")
+
+        # "Frames:" line, then "Frame Time:" line
+        f.readline()
+        fs_line = f.readline()
+        fs = fs_line[12:].strip()  # strip "Frame Time:"
+
+        # Stream the remaining motion lines straight into NumPy's C parser
+        # instead of materializing and re-joining them as Python strings.
+        data = np.loadtxt(f, dtype=dtype)
 
-    # Frame time is usually on the second line after 'MOTION'
-    fs_line = lines[data_start_idx + 2]
-    fs = fs_line[12:].strip()  # strip "Frame Time:"
-
-    # Motion data lines start after the frame header
-    motion_lines = lines[data_start_idx + 3 :]
-    # Use a temporary text buffer via numpy
-    from io import StringIO
-
-    buf = StringIO("".join(motion_lines))
-    data = np.loadtxt(buf)
-
-    header_lines = lines[: data_start_idx + 1]
     return data, fs, header_lines
 
 
@@ -84,23 +115,19 @@ def bvhoutput(data, fs, name, header_lines):
     """
     path_w = name + ".bvh"
 
-    # First write only the numeric data to a temporary file
-    tmp_path = path_w
-    np.savetxt(tmp_path, data, delimiter=" ", fmt="%.4e")
-
-    with open(tmp_path) as f:
-        motion_lines = f.readlines()
-
     n_frames = data.shape[0]
     frame_header = [
         f"Frames: {n_frames}\n",
         f"Frame Time: {fs}\n",
     ]
 
-    all_lines = header_lines + frame_header + motion_lines
-
-    with open(path_w, mode="w") as f:
-        f.writelines(all_lines)
+    # Write header and motion in a single pass through a large buffer;
+    # np.savetxt formats the numeric rows in C. The file is written under a
+    # temporary name and then renamed, so readers never see a partial BVH.
+    with atomic_open(path_w, mode="w", buffering=1024 * 1024) as f:
+        f.writelines(header_lines)
+        f.writelines(frame_header)
+        np.savetxt(f, data, delimiter=" ", fmt="%.4e")
 
 
 def errc(data, start, end):
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-file process pool shared by the dataset conversion scripts.
+
+Every clip is converted independently, so the scripts only need to run a
+worker over a list of files, optionally in several processes.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+
+def map_files(
+    worker: Callable[..., None],
+    files: List[str],
+    max_workers: Optional[int],
+    *args,
+) -> None:
+    """Run `worker(path, *args)` for every file, in worker processes if useful.
+
+    `max_workers=None` uses all CPUs; 1 (or a single file) runs serially in
+    the calling process. `worker` must be a module-level function so that
+    it can be dispatched to the worker processes.
+    """
+    if max_workers == 1 or len(files) <= 1:
+        for item in files:
+            worker(item, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, item, *args) for item in files]
+        # Re-raise the first worker error, if any
+        for future in futures:
+            future.result()
+
+
+def add_max_workers_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the `--max-workers` option used by the conversion scripts."""
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
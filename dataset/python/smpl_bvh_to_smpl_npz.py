@@ -4,7 +4,7 @@
 Convert retargeted SMPL BVH files to:
 
 1. Canonical SMPL BVH (using a reference SMPL T-pose BVH header),
-2. SMPL `.npz` files with:
+2. SMPL `.npz` files (float32) with:
    - trans: root translation (T, 3)
    - poses: axis-angle joint rotations (T, J, 3), J = 24 (SMPL joints).
 
@@ -32,7 +32,7 @@ JoruriPuppet dataset (`bvhForC`, `bvhSMPL`, `npz`).
 
 import argparse
 import os
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
@@ -44,16 +44,19 @@ if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 
 import bvh  # type: ignore
-import quat  # type: ignore
+from parallel import add_max_workers_argument, map_files  # type: ignore
 
 
 def get_bvh_files(directory: str) -> List[str]:
-    return [
-        os.path.join(directory, f)
-        for f in sorted(os.listdir(directory))
-        if os.path.isfile(os.path.join(directory, f))
-        and f.lower().endswith(".bvh")
-    ]
+    with os.scandir(directory) as it:
+        names = sorted(
+            e.name
+            for e in it
+            if e.is_file()
+            and e.name.lower().endswith(".bvh")
+            and not e.name.startswith("._")
+        )
+    return [os.path.join(directory, name) for name in names]
 
 
 def sample_every_three_2d(arr: np.ndarray) -> np.ndarray:
@@ -75,13 +78,9 @@ def sample_every_three_2d(arr: np.ndarray) -> np.ndarray:
     if arr.shape[1] == 72:
         return arr
 
-    result = []
-    for row in arr:
-        sampled_row = []
-        for i in range(0, len(row), 6):
-            sampled_row.extend(row[i : i + 3])
-        result.append(sampled_row)
-    return np.array(result)
+    # Keep columns 0-2 of every 6-column block in a single gather
+    keep = np.arange(arr.shape[1]) % 6 < 3
+    return arr[:, keep]
 
 
 SMPL_JOINT_NAMES = [
@@ -140,11 +139,147 @@ BVH_JOINT_NAMES = [
 ]
 
 
+NUM_SMPL_JOINTS = len(SMPL_JOINT_NAMES)
+
+# For each SMPL joint, the index of the same joint in the BVH joint order
+_SMPL_FROM_BVH_PERM = np.asarray(
+    [BVH_JOINT_NAMES.index(joint) for joint in SMPL_JOINT_NAMES], dtype=np.int64
+)
+
+
+def _euler_zxy_to_axis_angle(euler: np.ndarray, eps: float = 1e-5) -> np.ndarray:
+    """Convert ZXY Euler angles (radians) to axis-angle vectors.
+
+    Equivalent to `quat.to_axis_angle(quat.from_euler(euler, order="zxy"))`,
+    but the quaternion q = qz * qx * qy is expanded in closed form so that
+    no intermediate (..., 4) quaternion arrays are built.
+
+    Parameters
+    ----------
+    euler : np.ndarray, shape (..., 3)
+        Rotation angles about Z, X and Y, in radians.
+
+    Returns
+    -------
+    axis_angle : np.ndarray, shape (..., 3)
+        Axis-angle rotations, same dtype as `euler`.
+    """
+    half = 0.5 * euler
+    c = np.cos(half)
+    s = np.sin(half)
+    cz, cx, cy = c[..., 0], c[..., 1], c[..., 2]
+    sz, sx, sy = s[..., 0], s[..., 1], s[..., 2]
+
+    # Products of the Z and X terms are shared by all four components
+    czcx = cz * cx
+    czsx = cz * sx
+    szcx = sz * cx
+    szsx = sz * sx
+
+    w = czcx * cy - szsx * sy
+    xyz = np.empty_like(euler)
+    np.subtract(czsx * cy, szcx * sy, out=xyz[..., 0])
+    np.add(czcx * sy, szsx * cy, out=xyz[..., 1])
+    np.add(czsx * sy, szcx * cy, out=xyz[..., 2])
+
+    # Same small-angle handling as quat.to_axis_angle
+    half_angle = np.arctan2(np.linalg.norm(xyz, axis=-1), w)
+    angle = 2 * half_angle
+    small_angle = np.abs(angle) < eps
+    scale = np.empty_like(angle)
+    scale[~small_angle] = angle[~small_angle] / np.sin(half_angle[~small_angle])
+    scale[small_angle] = 1.0 / (0.5 - (angle[small_angle] ** 2) / 48)
+    xyz *= scale[..., None]
+    return xyz
+
+
+def _standardize_smpl_data(data: np.ndarray) -> np.ndarray:
+    """Turn MotionBuilder output motion into canonical SMPL BVH motion."""
+    # Drop the first frame (T-pose inserted for retargeting)
+    pos = data[1:, :3]
+    rot_raw = data[1:, 3:]
+
+    # Reduce from 6 channels per joint to 3 channels per joint
+    rot_euler = sample_every_three_2d(rot_raw)
+
+    return np.concatenate([pos, rot_euler], axis=1)
+
+
+def _save_smpl_npz(data: np.ndarray, out_path: str, trans_scale: float) -> None:
+    """Save canonical SMPL BVH motion as an SMPL NPZ (trans + poses).
+
+    Both arrays are stored as float32, which is ample precision for motion
+    and halves the file size compared to float64.
+    """
+    pos = data[:, :3]
+    if trans_scale != 1.0:
+        pos = pos * float(trans_scale)
+    pos = pos.astype(np.float32, copy=False)
+    rotation = data[:, 3:].astype(np.float32)
+
+    # SMPL BVH always carries 24 joints x 3 Euler channels (ZXY order)
+    rotation = rotation.reshape([rotation.shape[0], NUM_SMPL_JOINTS, 3])
+
+    # Reorder joints to match SMPL joint order, then degrees -> radians in place
+    rotation_s = rotation[:, _SMPL_FROM_BVH_PERM]
+    rotation_s *= np.float32(np.pi / 180.0)
+
+    axis_angle = _euler_zxy_to_axis_angle(rotation_s)
+
+    # Write to a temporary name and rename, so an interrupted run never
+    # leaves a truncated .npz behind.
+    with bvh.atomic_open(out_path, "wb", buffering=1024 * 1024) as fh:
+        np.savez(fh, trans=pos, poses=axis_angle)
+
+
+def _standardize_one(item: str, smpl_header: List[str], out_dir: str) -> None:
+    """Write the canonical SMPL BVH for one MotionBuilder output clip."""
+    filename = os.path.splitext(os.path.basename(item))[0]
+
+    data, fs, _ = bvh.bvhreader(item)
+    data_new = _standardize_smpl_data(data)
+
+    out_name = os.path.join(out_dir, filename)
+    bvh.bvhoutput(data_new, fs, out_name, smpl_header)
+
+
+def _convert_one(item: str, out_dir: str, trans_scale: float) -> None:
+    """Write the SMPL NPZ (trans + poses) for one SMPL BVH clip."""
+    filename = os.path.splitext(os.path.basename(item))[0]
+
+    data, _, _ = bvh.bvhreader(item)
+
+    out_path = os.path.join(out_dir, filename + ".npz")
+    _save_smpl_npz(data, out_path, trans_scale)
+
+
+def _standardize_and_convert_one(
+    item: str,
+    smpl_header: List[str],
+    out_bvh_dir: str,
+    out_npz_dir: str,
+    trans_scale: float,
+) -> None:
+    """Write both the canonical SMPL BVH and the NPZ for one clip.
+
+    The MotionBuilder output is parsed once and the NPZ is computed from
+    the in-memory motion, instead of re-reading the BVH just written.
+    """
+    filename = os.path.splitext(os.path.basename(item))[0]
+
+    data, fs, _ = bvh.bvhreader(item)
+    data_new = _standardize_smpl_data(data)
+
+    bvh.bvhoutput(data_new, fs, os.path.join(out_bvh_dir, filename), smpl_header)
+    _save_smpl_npz(data_new, os.path.join(out_npz_dir, filename + ".npz"), trans_scale)
+
+
 def build_smpl_bvh(
     root: str,
     smpl_t_bvh_path: str,
     input_bvh_dir: str = "bvhForC/output",
     out_bvh_smpl_dir: str = "bvhSMPL",
+    max_workers: Optional[int] = None,
 ) -> None:
     """Create canonical SMPL BVH files using a reference SMPL T-pose BVH."""
     _, _, smpl_header = bvh.bvhreader(smpl_t_bvh_path)
@@ -154,22 +289,7 @@ def build_smpl_bvh(
     os.makedirs(out_dir, exist_ok=True)
 
     files = get_bvh_files(input_dir)
-
-    for item in files:
-        filename = os.path.splitext(os.path.basename(item))[0]
-
-        data, fs, _ = bvh.bvhreader(item)
-
-        # Drop the first frame (T-pose inserted for retargeting)
-        pos = data[1:, :3]
-        rot_raw = data[1:, 3:]
-
-        # Reduce from 6 channels per joint to 3 channels per joint
-        rot_euler = sample_every_three_2d(rot_raw)
-
-        data_new = np.concatenate([pos, rot_euler], axis=1)
-        out_name = os.path.join(out_dir, filename)
-        bvh.bvhoutput(data_new, fs, out_name, smpl_header)
+    map_files(_standardize_one, files, max_workers, smpl_header, out_dir)
 
 
 def build_smpl_npz(
@@ -177,6 +297,7 @@ def build_smpl_npz(
     in_bvh_smpl_dir: str = "bvhSMPL",
     out_npz_dir: str = "npz",
     trans_scale: float = 1.0,
+    max_workers: Optional[int] = None,
 ) -> None:
     """Convert SMPL BVH files to SMPL-style NPZ files (trans + poses).
 
@@ -185,38 +306,51 @@ def build_smpl_npz(
     trans_scale : float
         Scale factor applied to BVH root translation before saving to NPZ.
         Use 0.01 for cm->m conversion (i.e., divide by 100).
+    max_workers : int, optional
+        Number of worker processes. None uses all CPUs; 1 runs serially.
     """
     in_dir = os.path.join(root, in_bvh_smpl_dir)
     out_dir = os.path.join(root, out_npz_dir)
     os.makedirs(out_dir, exist_ok=True)
 
     files = get_bvh_files(in_dir)
+    map_files(_convert_one, files, max_workers, out_dir, float(trans_scale))
 
-    for item in files:
-        filename = os.path.splitext(os.path.basename(item))[0]
-
-        data, _, _ = bvh.bvhreader(item)
-
-        pos = data[:, :3]
-        if trans_scale != 1.0:
-            pos = pos * float(trans_scale)
-        rotation = data[:, 3:]
 
-        rotation = rotation.reshape([rotation.shape[0], int(rotation.shape[1] / 3), 3])
-        rotation = np.deg2rad(rotation)
+def build_smpl_bvh_and_npz(
+    root: str,
+    smpl_t_bvh_path: str,
+    input_bvh_dir: str = "bvhForC/output",
+    out_bvh_smpl_dir: str = "bvhSMPL",
+    out_npz_dir: str = "npz",
+    trans_scale: float = 1.0,
+    max_workers: Optional[int] = None,
+) -> None:
+    """Run `build_smpl_bvh` and `build_smpl_npz` in a single pass.
 
-        # Reorder joints to match SMPL joint order
-        rotation_s = np.zeros_like(rotation)
-        for i, joint in enumerate(SMPL_JOINT_NAMES):
-            idx = BVH_JOINT_NAMES.index(joint)
-            rotation_s[:, i] = rotation[:, idx]
+    Each MotionBuilder output clip is parsed once; the canonical SMPL BVH
+    and the NPZ are both written from the same in-memory motion. Note that
+    the NPZ is then computed from full-precision values rather than from
+    the values as rounded when writing the SMPL BVH text.
+    """
+    _, _, smpl_header = bvh.bvhreader(smpl_t_bvh_path)
 
-        order = "zxy"
-        quat_root_new = quat.from_euler(rotation_s, order=order)
-        axis_angle = quat.to_axis_angle(quat_root_new)
+    input_dir = os.path.join(root, input_bvh_dir)
+    out_bvh_dir = os.path.join(root, out_bvh_smpl_dir)
+    out_npz_dir_abs = os.path.join(root, out_npz_dir)
+    os.makedirs(out_bvh_dir, exist_ok=True)
+    os.makedirs(out_npz_dir_abs, exist_ok=True)
 
-        out_path = os.path.join(out_dir, filename + ".npz")
-        np.savez(out_path, trans=pos, poses=axis_angle)
+    files = get_bvh_files(input_dir)
+    map_files(
+        _standardize_and_convert_one,
+        files,
+        max_workers,
+        smpl_header,
+        out_bvh_dir,
+        out_npz_dir_abs,
+        float(trans_scale),
+    )
 
 
 def main():
@@ -262,23 +396,21 @@ def main():
         ),
     )
 
+    add_max_workers_argument(parser)
+
     args = parser.parse_args()
 
     root = os.path.abspath(args.root)
     smpl_t_bvh_path = os.path.abspath(args.smpl_t_bvh)
 
-    build_smpl_bvh(
+    build_smpl_bvh_and_npz(
         root=root,
         smpl_t_bvh_path=smpl_t_bvh_path,
         input_bvh_dir=args.input_bvh_dir,
         out_bvh_smpl_dir=args.out_bvh_smpl_dir,
-    )
-
-    build_smpl_npz(
-        root=root,
-        in_bvh_smpl_dir=args.out_bvh_smpl_dir,
         out_npz_dir=args.out_npz_dir,
         trans_scale=args.trans_scale,
+        max_workers=args.max_workers,
     )
 
     print(f"SMPL BVH written to: {os.path.join(root, args.out_bvh_smpl_dir)}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fused entry point for the position-based metrics.
+
+`compute_all` evaluates the S-curve scores of the head and both hands and
+the head–hand contrast features for one clip. Beat times are extracted
+once, and the S-curve segments of all joints are scored in a single
+batched pass (see `s_curve.s_curve_scores_from_joints`) instead of one
+call per joint.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from . import head_hand_contrast
+from . import s_curve
+from . import tempo_utils
+
+
+@dataclass
+class PositionMetrics:
+    """S-curve scores and contrast features of one clip."""
+
+    s_curve_head: float
+    s_curve_right_hand: float
+    s_curve_left_hand: Optional[float]
+    contrast: head_hand_contrast.HeadHandContrastFeatures
+
+
+def compute_all(
+    audio_path: str,
+    head_positions: np.ndarray,
+    right_hand_positions: np.ndarray,
+    left_hand_positions: Optional[np.ndarray],
+    fps: float,
+    fps_madmom: int = 100,
+    min_pct: float = 20.0,
+    max_pct: float = 60.0,
+    smooth_sigma: float = 5.0,
+    beat_times: Optional[np.ndarray] = None,
+) -> PositionMetrics:
+    """
+    Compute all position-based metrics for one clip.
+
+    Parameters
+    ----------
+    audio_path : str
+        Path to the audio file (only used if `beat_times` is None).
+    head_positions : np.ndarray, shape (T, 3)
+        3D positions of the head joint.
+    right_hand_positions : np.ndarray, shape (T, 3)
+        3D positions of the right hand joint.
+    left_hand_positions : np.ndarray, shape (T, 3), optional
+        3D positions of the left hand joint, or None to skip it.
+    fps : float
+        Motion frame rate.
+    fps_madmom : int, optional
+        Frame rate for the DBN beat tracker, by default 100.
+    min_pct, max_pct : float
+        Desirable curvature percentage range for the S-curve.
+    smooth_sigma : float, optional
+        Gaussian smoothing sigma (in frames) for the contrast features,
+        by default 5.
+    beat_times : np.ndarray, optional
+        Precomputed beat times (seconds) for `audio_path`.
+
+    Returns
+    -------
+    PositionMetrics
+        S-curve scores for head, right hand and left hand (None if not
+        given), and the head–hand contrast features.
+    """
+    if beat_times is None:
+        beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
+
+    joints = [head_positions, right_hand_positions]
+    if left_hand_positions is not None:
+        joints.append(left_hand_positions)
+    scores = s_curve.s_curve_scores_from_joints(
+        np.stack(joints, axis=1), beat_times, fps, min_pct=min_pct, max_pct=max_pct
+    )
+
+    contrast = head_hand_contrast.head_hand_contrast_from_audio_and_positions(
+        audio_path=audio_path,
+        head_positions=head_positions,
+        hand_positions=right_hand_positions,
+        fps=fps,
+        smooth_sigma=smooth_sigma,
+        beat_times=beat_times,
+    )
+
+    return PositionMetrics(
+        s_curve_head=float(scores[0]),
+        s_curve_right_hand=float(scores[1]),
+        s_curve_left_hand=float(scores[2]) if left_hand_positions is not None else None,
+        contrast=contrast,
+    )
@@ -0,0 +1,45 @@
+"""
+Helpers for the on-disk caches of the metrics (beat times, TRC positions).
+"""
+
+import os
+from typing import Callable, IO
+
+
+def write_cache_file(path: str, write: Callable[[IO], None], mode: str = 'wb') -> bool:
+    """
+    Atomically write one cache file, on a best-effort basis.
+
+    `write(f)` fills a temporary file `<path>.<pid>.tmp`, which then
+    replaces `path`, so concurrent readers never see a partial file. The
+    caches are only an optimization: if the file cannot be written (e.g.
+    a read-only home directory), the temporary file is removed and False
+    is returned instead of raising.
+
+    Parameters
+    ----------
+    path : str
+        Cache file path; its directory is created if needed.
+    write : Callable[[IO], None]
+        Writes the contents to the open file object.
+    mode : str, optional
+        File mode, 'wb' (default) or 'w'.
+
+    Returns
+    -------
+    written : bool
+        Whether `path` now holds the new contents.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
@@ -7,157 +7,376 @@ Example script to run the three proposed metrics:
 3. Head–Hand Contrast (Theatrical contrast)
 
 This script loads example data (BVH/NPZ/TRC + WAV) and prints the scores.
+Run from the repository root with
+
+    python -m metrics.examples.run_metrics_example [data_root] [--batch]
+
+With --batch, every clip under bvhSMPL/ is evaluated in parallel and the
+scores are written as CSV, one row per clip.
 """
 
+import argparse
+import functools
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
+
+from metrics import all_metrics
+from metrics import jo_ha_kyu
+from metrics import io_utils
+from metrics import tempo_utils
 
-# Add repository root to sys.path
+# Repository root, for the default example data. The `metrics` package is
+# imported from the installed project (`pip install -e .`) or, with
+# `python -m metrics.examples.run_metrics_example`, from the current
+# directory.
 current_dir = os.path.dirname(os.path.abspath(__file__))
 repo_root = os.path.abspath(os.path.join(current_dir, "../../"))
-sys.path.insert(0, repo_root)
 
-from metrics import jo_ha_kyu
-from metrics import s_curve
-from metrics import head_hand_contrast
-from metrics import io_utils
+# DBN frame rate used for all beat tracking in this script
+BEAT_FPS = 100
+
+# Reported beat source, per tempo_utils.get_beat_times_with_source
+BEATS_SOURCE_MESSAGES = {
+    tempo_utils.BEATS_FROM_SIDECAR: "Using precomputed beats",
+    tempo_utils.BEATS_FROM_CACHE: "Using cached beats (DBN beat tracker skipped)",
+    tempo_utils.BEATS_FROM_TRACKER: "Ran DBN beat tracker",
+}
+
+
+def clip_paths(data_root, bvh_path):
+    """TRC and WAV paths paired with an SMPL BVH (clip_001Re.bvh -> clip_001.wav)."""
+    stem = os.path.splitext(os.path.basename(bvh_path))[0]
+    trc_path = os.path.join(data_root, "trcSMPL", stem + ".trc")
+    wav_stem = stem[:-2] if stem.endswith("Re") else stem
+    wav_path = os.path.join(data_root, "wav", wav_stem + ".wav")
+    return trc_path, wav_path
+
+
+def _list_names(directory):
+    """File names in a directory (one scandir), or an empty set if missing."""
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name for entry in it if entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def run_metrics_one(
+    bvh_path, trc_path, wav_path, exists=None, trc_cache=True, beat_cache=True
+):
+    """
+    Compute all metrics for one clip without printing.
+
+    `exists` optionally maps each of the three paths to whether it
+    exists (batch mode fills it from directory listings); otherwise each
+    path is checked once here. With `trc_cache=False` the TRC positions
+    are parsed every time instead of going through the on-disk cache, and
+    with `beat_cache=False` beat times are not cached on disk either.
+
+    Returns a dict of scores. A metric that cannot be computed is left
+    out and its error message is stored under result["errors"][name].
+    """
+    result = {"errors": {}}
+    errors = result["errors"]
+
+    if exists is None:
+        exists = {p: os.path.exists(p) for p in (bvh_path, trc_path, wav_path)}
+    if not (exists[bvh_path] and exists[wav_path]):
+        errors["input"] = "Missing example files (BVH or WAV)."
+        return result
+
+    # Beat tracking dominates the runtime and all metrics use the same
+    # beats, so extract them once (cached across runs, see tempo_utils).
+    # Beats shipped next to the audio (clip.beats.npy) skip Madmom.
+    try:
+        beat_times, beats_source = tempo_utils.get_beat_times_with_source(
+            wav_path, fps=BEAT_FPS, cache_dir=None if beat_cache else False
+        )
+    except Exception as e:
+        errors["beats"] = f"Failed to extract beat times: {e}"
+        return result
+    result["beats_source"] = beats_source
+
+    # --- 1. Jo–Ha–Kyu Score ---
+    try:
+        # Compute score from BVH
+        jhk = jo_ha_kyu.compute_jo_ha_kyu_from_bvh_and_audio(
+            bvh_path=bvh_path,
+            audio_path=wav_path,
+            fps_madmom=BEAT_FPS,  # Standard setting
+            beat_times=beat_times,
+        )
+        result["jo_ha_kyu_r"] = jhk.r
+        result["jo_ha_kyu_p"] = jhk.p_value
+    except Exception as e:
+        errors["jo_ha_kyu"] = f"Failed to compute Jo-Ha-Kyu: {e}"
+
+    # --- Head and hand positions for the position-based metrics ---
+    if not exists[trc_path]:
+        errors["s_curve"] = "Skipping S-curve (TRC file not found)."
+        errors["contrast"] = "Skipping Contrast (TRC file missing or load failed)."
+        return result
+
+    try:
+        keys, _, _ = io_utils.read_trc_header(trc_path)
+
+        # Extract Head and Hand positions
+        # Joint names must match what is in the TRC file. 
+        # Based on typical SMPL TRC exports: 'Head', 'Right_hand' (or 'RightHand'),
+        # falling back to fuzzy matches such as 'Right_wrist'
+        resolved = io_utils.resolve_joint_names(keys)
+        head_key = resolved['head']
+        hand_key = resolved['right_hand']
+        l_hand_key = resolved['left_hand']
+        result["joints"] = (head_key, hand_key, l_hand_key)
+
+        # Only these markers are parsed; they come from a memory-mapped
+        # float32 cache after the first run (see
+        # io_utils.read_trc_positions_cached)
+        joints = [head_key, hand_key]
+        if l_hand_key in keys:
+            joints.append(l_hand_key)
+        if trc_cache:
+            read_positions = io_utils.read_trc_positions_cached
+        else:
+            read_positions = io_utils.read_trc_positions
+        positions, _, fps, _ = read_positions(trc_path, joints=joints)
+
+        head_pos = positions[:, 0]
+        r_hand_pos = positions[:, 1]
+        l_hand_pos = positions[:, 2] if len(joints) == 3 else None
+    except Exception as e:
+        errors["s_curve"] = f"Failed to compute S-curve: {e}"
+        errors["contrast"] = "Skipping Contrast (TRC file missing or load failed)."
+        return result
+
+    # --- 2 + 3. S-curve and Head-Hand Contrast in one pass ---
+    try:
+        # Contrast: raw features only. Mapping Xp to a [0, 1] score needs
+        # mu_x, sigma_x learned from the training set:
+        # score = head_hand_contrast.gaussian_contrast_score(xp_mean, mu_target, sigma_target)
+        metrics = all_metrics.compute_all(
+            audio_path=wav_path,
+            head_positions=head_pos,
+            right_hand_positions=r_hand_pos,
+            left_hand_positions=l_hand_pos,
+            fps=fps,
+            beat_times=beat_times,
+        )
+        result["s_curve_head"] = metrics.s_curve_head
+        result["s_curve_right_hand"] = metrics.s_curve_right_hand
+        if metrics.s_curve_left_hand is not None:
+            result["s_curve_left_hand"] = metrics.s_curve_left_hand
+        result["xp_mean"] = metrics.contrast.xp_mean
+    except Exception as e:
+        errors["s_curve"] = f"Failed to compute S-curve: {e}"
+        errors["contrast"] = f"Failed to compute Contrast: {e}"
+
+    return result
+
 
-def run_metrics(example_data_root):
+def run_metrics(example_data_root, trc_cache=True, beat_cache=True):
     print(f"Running metrics on data from: {example_data_root}")
     
     # Paths to example files
     # Note: clip_001Re.bvh and clip_001Re.trc are the SMPL-retargeted versions
     bvh_path = os.path.join(example_data_root, "bvhSMPL", "clip_001Re.bvh")
-    trc_path = os.path.join(example_data_root, "trcSMPL", "clip_001Re.trc")
-    wav_path = os.path.join(example_data_root, "wav", "clip_001.wav")
-    
-    if not (os.path.exists(bvh_path) and os.path.exists(wav_path)):
-        print("Error: Missing example files (BVH or WAV).")
-        return
+    trc_path, wav_path = clip_paths(example_data_root, bvh_path)
+
+    result = run_metrics_one(
+        bvh_path, trc_path, wav_path, trc_cache=trc_cache, beat_cache=beat_cache
+    )
+    errors = result["errors"]
+    for key in ("input", "beats"):
+        if key in errors:
+            print(f"Error: {errors[key]}")
+            return
+    print(BEATS_SOURCE_MESSAGES[result["beats_source"]])
 
-    # --- 1. Jo–Ha–Kyu Score ---
     print("\n--- [Metric 1] Jo–Ha–Kyu Score ---")
     print("Calculating correlation between music tempo and motion speed...")
-    try:
-        # Compute score from BVH
-        result = jo_ha_kyu.compute_jo_ha_kyu_from_bvh_and_audio(
-            bvh_path=bvh_path,
-            audio_path=wav_path,
-            fps_madmom=100  # Standard setting
-        )
-        print(f"Result: r = {result.r:.4f}, p-value = {result.p_value:.4e}")
+    if "jo_ha_kyu" in errors:
+        print(errors["jo_ha_kyu"])
+    else:
+        print(f"Result: r = {result['jo_ha_kyu_r']:.4f}, p-value = {result['jo_ha_kyu_p']:.4e}")
         print(f" (Correlation > 0 indicates positive synchronization with tempo changes)")
-    except Exception as e:
-        print(f"Failed to compute Jo-Ha-Kyu: {e}")
 
-    # --- 2. S-curve Score ---
     print("\n--- [Metric 2] S-curve Score ---")
-    if os.path.exists(trc_path):
+    if "joints" in result:
         print("Loading TRC for position-based metrics...")
-        try:
-            joints_dict, fps, _ = io_utils.read_trc(trc_path)
-            
-            # Extract Head and Hand positions
-            # Joint names must match what is in the TRC file. 
-            # Based on typical SMPL TRC exports: 'Head', 'Right_hand' (or 'RightHand')
-            # Let's check keys or try standard names
-            head_key = 'Head'
-            hand_key = 'Right_hand' # Adjust based on your TRC column names
-            
-            # Fallback lookup if exact key not found
-            keys = list(joints_dict.keys())
-            if head_key not in keys:
-                # Try to find something similar
-                head_matches = [k for k in keys if 'head' in k.lower()]
-                if head_matches: head_key = head_matches[0]
-            
-            if hand_key not in keys:
-                hand_matches = [k for k in keys if 'right' in k.lower() and ('hand' in k.lower() or 'wrist' in k.lower())]
-                if hand_matches: hand_key = hand_matches[0]
-                
-            # Also try to find Left Hand for comparison
-            l_hand_key = 'Left_hand'
-            if l_hand_key not in keys:
-                l_hand_matches = [k for k in keys if 'left' in k.lower() and ('hand' in k.lower() or 'wrist' in k.lower())]
-                if l_hand_matches: l_hand_key = l_hand_matches[0]
-
-            print(f"Using joints: Head='{head_key}', R_Hand='{hand_key}', L_Hand='{l_hand_key}'")
-            
-            head_pos = joints_dict[head_key]
-            r_hand_pos = joints_dict[hand_key]
-            
-            # Compute Head & Right Hand
-            head_score, r_hand_score = s_curve.s_curve_scores_from_audio_and_positions(
-                audio_path=wav_path,
-                head_positions=head_pos,
-                hand_positions=r_hand_pos,
-                fps=fps
-            )
-            print(f"Head S-curve Score: {head_score:.4f}")
-            print(f"Right Hand S-curve Score: {r_hand_score:.4f}")
-
-            # Compute Left Hand if available
-            if l_hand_key in joints_dict:
-                l_hand_pos = joints_dict[l_hand_key]
-                # We can reuse the single-joint function internally or just call the pair function again
-                # Here we just call the core function for single joint
-                # Note: io_utils doesn't export tempo_utils, we should use the imported module 'tempo_utils' directly?
-                # Actually, we already imported 'from metrics import tempo_utils' at top level? No, we imported jo_ha_kyu etc.
-                # Let's add the import if missing or use jo_ha_kyu's internal one, but better to import tempo_utils directly.
-                # Checking imports... "from metrics import io_utils" is there. 
-                # We need to import tempo_utils explicitly in this script.
-                
-                from metrics import tempo_utils as t_utils
-                beat_times = t_utils.get_beat_times(wav_path, fps=100)
-                l_hand_score = s_curve.s_curve_score_from_positions(l_hand_pos, beat_times, fps)
-                print(f"Left Hand S-curve Score:  {l_hand_score:.4f}")
-            
-            print(" (Scores represent the percentage of beat segments with 'desirable' curvature)")
-            
-        except Exception as e:
-            print(f"Failed to compute S-curve: {e}")
+        head_key, hand_key, l_hand_key = result["joints"]
+        print(f"Using joints: Head='{head_key}', R_Hand='{hand_key}', L_Hand='{l_hand_key}'")
+    if "s_curve" in errors:
+        print(errors["s_curve"])
     else:
-        print("Skipping S-curve (TRC file not found).")
+        print(f"Head S-curve Score: {result['s_curve_head']:.4f}")
+        print(f"Right Hand S-curve Score: {result['s_curve_right_hand']:.4f}")
+        if "s_curve_left_hand" in result:
+            print(f"Left Hand S-curve Score:  {result['s_curve_left_hand']:.4f}")
+        print(" (Scores represent the percentage of beat segments with 'desirable' curvature)")
 
-    # --- 3. Head-Hand Contrast ---
     print("\n--- [Metric 3] Head-Hand Contrast Score ---")
-    # Note: we renamed hand_pos to r_hand_pos above, so need to update here
-    if os.path.exists(trc_path) and 'head_pos' in locals() and 'r_hand_pos' in locals():
-        try:
-            # Need parameters mu_x, sigma_x for the Gaussian mapping
-            # These are typically learned from the training set.
-            # We use placeholder values here or raw features.
-            # Let's just print the raw features first.
-            
-            features = head_hand_contrast.head_hand_contrast_from_audio_and_positions(
-                audio_path=wav_path,
-                head_positions=head_pos,
-                hand_positions=r_hand_pos,
-                fps=fps
-            )
-            
-            print(f"Raw Features:")
-            print(f"  Xp Mean Diff: {features.xp_mean:.4f}")
-            
-            # To get a final score [0, 1], we would do:
-            # score = head_hand_contrast.gaussian_contrast_score(features.xp_mean, mu_target, sigma_target)
-            # print(f"Final Contrast Score: {score:.4f} (using dummy distribution)")
-            
-        except Exception as e:
-            print(f"Failed to compute Contrast: {e}")
+    if "contrast" in errors:
+        print(errors["contrast"])
     else:
-        print("Skipping Contrast (TRC file missing or load failed).")
+        print(f"Raw Features:")
+        print(f"  Xp Mean Diff: {result['xp_mean']:.4f}")
+
+
+def _run_metrics_clip(args, trc_cache=True, beat_cache=True):
+    bvh_path, trc_path, wav_path, exists = args
+    result = run_metrics_one(
+        bvh_path,
+        trc_path,
+        wav_path,
+        exists=exists,
+        trc_cache=trc_cache,
+        beat_cache=beat_cache,
+    )
+    result["clip"] = os.path.splitext(os.path.basename(bvh_path))[0]
+    return result
+
+
+def _batch_tasks(data_root):
+    """(bvh, trc, wav, exists) per clip, from one listing per directory."""
+    bvh_dir = os.path.join(data_root, "bvhSMPL")
+    trc_names = _list_names(os.path.join(data_root, "trcSMPL"))
+    wav_names = _list_names(os.path.join(data_root, "wav"))
+
+    tasks = []
+    for name in sorted(_list_names(bvh_dir)):
+        if not name.endswith(".bvh"):
+            continue
+        bvh_path = os.path.join(bvh_dir, name)
+        trc_path, wav_path = clip_paths(data_root, bvh_path)
+        exists = {
+            bvh_path: True,
+            trc_path: os.path.basename(trc_path) in trc_names,
+            wav_path: os.path.basename(wav_path) in wav_names,
+        }
+        tasks.append((bvh_path, trc_path, wav_path, exists))
+    return tasks
+
+
+def run_metrics_batch(data_root, max_workers=None, trc_cache=True, beat_cache=True):
+    """
+    Compute all metrics for every clip in `data_root/bvhSMPL`.
+
+    Clips are independent, so they are spread over a process pool
+    (one worker per CPU by default). Returns one result dict per clip
+    (see `run_metrics_one`), in sorted clip order.
+    """
+    tasks = _batch_tasks(data_root)
+    run_clip = functools.partial(
+        _run_metrics_clip, trc_cache=trc_cache, beat_cache=beat_cache
+    )
+    if max_workers == 1 or len(tasks) <= 1:
+        return [run_clip(t) for t in tasks]
+
+    # Madmom models are loaded lazily (tempo_utils.get_beat_processors),
+    # so workers whose clips have sidecars or cached beats never load them
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_clip, tasks))
+
+
+# Batch output columns: (table field, run_metrics_one key)
+BATCH_FIELDS = [
+    ("r", "jo_ha_kyu_r"),
+    ("p", "jo_ha_kyu_p"),
+    ("head", "s_curve_head"),
+    ("r_hand", "s_curve_right_hand"),
+    ("l_hand", "s_curve_left_hand"),
+    ("xp", "xp_mean"),
+]
+
+
+def batch_results_table(results):
+    """
+    Collect batch results into one record array (NaN for missing scores).
+
+    Fields are `clip` followed by r, p, head, r_hand, l_hand and xp.
+    """
+    clip_len = max([len(result["clip"]) for result in results] + [1])
+    dtype = [("clip", f"U{clip_len}")] + [(name, "f4") for name, _ in BATCH_FIELDS]
+    table = np.recarray(len(results), dtype=dtype)
+    for i, result in enumerate(results):
+        table[i] = (result["clip"],) + tuple(
+            result.get(key, np.nan) for _, key in BATCH_FIELDS
+        )
+    return table
+
+
+def _write_batch(results, output_path=None):
+    # Errors go to stderr so that stdout stays a clean CSV
+    for result in results:
+        for message in result["errors"].values():
+            print(f"{result['clip']}: {message}", file=sys.stderr)
+
+    table = pd.DataFrame(batch_results_table(results))
+    table.to_csv(output_path if output_path else sys.stdout, index=False)
+
 
 if __name__ == "__main__":
     # Default example data path (relative to this script)
     # Updated to use the internal 'exampleData' inside the repo
     default_data = os.path.abspath(os.path.join(repo_root, "exampleData"))
-    
-    if len(sys.argv) > 1:
-        data_path = sys.argv[1]
-    else:
-        data_path = default_data
-        
-    run_metrics(data_path)
 
+    parser = argparse.ArgumentParser(description="Compute the three metrics on example data.")
+    parser.add_argument(
+        "data_root",
+        nargs="?",
+        default=default_data,
+        help="Directory with bvhSMPL/, trcSMPL/ and wav/ (default: exampleData).",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Evaluate every clip in bvhSMPL/ and write one CSV row per clip.",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="CSV path for --batch results (default: stdout).",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--no-trc-cache",
+        action="store_true",
+        help=(
+            "Parse TRC files every time instead of caching the positions "
+            f"under {io_utils.TRC_CACHE_DIR}."
+        ),
+    )
+    parser.add_argument(
+        "--no-beat-cache",
+        action="store_true",
+        help=(
+            "Run the beat tracker every time instead of caching beat times "
+            f"under {tempo_utils.BEAT_CACHE_DIR}."
+        ),
+    )
+    args = parser.parse_args()
+
+    if args.batch:
+        results = run_metrics_batch(
+            args.data_root,
+            max_workers=args.max_workers,
+            trc_cache=not args.no_trc_cache,
+            beat_cache=not args.no_beat_cache,
+        )
+        _write_batch(results, args.output)
+    else:
+        run_metrics(
+            args.data_root,
+            trc_cache=not args.no_trc_cache,
+            beat_cache=not args.no_beat_cache,
+        )
@@ -21,7 +21,7 @@ The implementation follows the structure of the original analysis code:
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 from scipy.ndimage import gaussian_filter1d
@@ -80,8 +80,15 @@ def _contrast_features_per_sequence(
             seg_hand = hand_positions[start_hand:end_hand]
             seg_head = head_positions[start_head:end_head]
 
-            seg_hand = gaussian_filter1d(seg_hand, smooth_sigma, axis=0)
-            seg_head = gaussian_filter1d(seg_head, smooth_sigma, axis=0)
+            # Smoothing and PCA run in float64 even for float32 positions:
+            # the 2-frame segments clamped at the end of the motion are
+            # near-degenerate and PCA on them is precision sensitive
+            seg_hand = gaussian_filter1d(
+                seg_hand.astype(np.float64), smooth_sigma, axis=0
+            )
+            seg_head = gaussian_filter1d(
+                seg_head.astype(np.float64), smooth_sigma, axis=0
+            )
 
             # PCA to 2D for normalization (optional but kept for consistency with PCA1 logic)
             pca2 = PCA(n_components=2)
@@ -158,12 +165,17 @@ def head_hand_contrast_from_audio_and_positions(
     fps: float,
     fps_madmom: int = 100,
     smooth_sigma: float = 5.0,
+    beat_times: Optional[np.ndarray] = None,
 ) -> HeadHandContrastFeatures:
     """
     High-level helper: extract beat times from audio, then compute
     aggregated contrast features from head and hand positions.
+
+    If `beat_times` is given, it is used instead of running beat tracking
+    on `audio_path` again.
     """
-    beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
+    if beat_times is None:
+        beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
     return _contrast_features_per_sequence(
         head_positions=head_positions,
         hand_positions=hand_positions,
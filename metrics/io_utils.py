@@ -2,8 +2,10 @@
 I/O utilities for reading motion files (BVH, TRC, NPZ) for metrics evaluation.
 """
 
+import hashlib
+import json
 import os
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
@@ -11,8 +13,20 @@ import pandas as pd
 # Reuse the existing BVH reader from dataset/python
 from dataset.python import bvh as bvh_utils
 
+from .cache_utils import write_cache_file
 
-def read_bvh(path: str) -> Tuple[np.ndarray, float, Dict[str, int]]:
+
+# Default location of the binary TRC position cache (see
+# `read_trc_positions_cached`)
+TRC_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "tempo_changing_music2motion", "trc"
+)
+
+
+def read_bvh(
+    path: str,
+    dtype: np.dtype = np.float32,
+) -> Tuple[np.ndarray, float, Dict[str, int]]:
     """
     Read a BVH file and return motion data, frame time, and a joint map.
 
@@ -20,6 +34,8 @@ def read_bvh(path: str) -> Tuple[np.ndarray, float, Dict[str, int]]:
     ----------
     path : str
         Path to the BVH file.
+    dtype : np.dtype, optional
+        dtype of the motion data, by default float32 (ample for metrics).
 
     Returns
     -------
@@ -33,7 +49,7 @@ def read_bvh(path: str) -> Tuple[np.ndarray, float, Dict[str, int]]:
          object, so we might only get raw data. For accurate joint positions,
          use TRC or a full FK engine.)
     """
-    data, fs_str, header = bvh_utils.bvhreader(path)
+    data, fs_str, header = bvh_utils.bvhreader(path, dtype=dtype)
     try:
         frame_time = float(fs_str)
     except ValueError:
@@ -50,14 +66,214 @@ def read_bvh(path: str) -> Tuple[np.ndarray, float, Dict[str, int]]:
     return data, frame_time, {}
 
 
-def read_trc(path: str) -> Tuple[Dict[str, np.ndarray], float, int]:
+def _parse_trc_header(f) -> Tuple[List[str], float, int]:
+    """Consume the 5 header lines of an open (binary) TRC file."""
+    header_lines = [f.readline().decode() for _ in range(5)]
+
+    # Line 3 contains metadata (DataRate, CameraRate, NumFrames, etc.)
+    meta_info = header_lines[2].strip().split('\t')
+    try:
+        data_rate = float(meta_info[0])
+        num_frames = int(meta_info[2])
+    except (ValueError, IndexError):
+        # Fallback if tab splitting fails or format slightly differs
+        # Try splitting by whitespace
+        meta_info = header_lines[2].strip().split()
+        data_rate = float(meta_info[0])
+        num_frames = int(meta_info[2])
+
+    # Line 4 contains marker names
+    # Format: Frame# Time Marker1 <tab> <tab> Marker2 ...
+    # Each marker name appears once, above its X column; the Y and Z
+    # columns have empty header cells.
+    header_row = header_lines[3].strip().split('\t')
+    marker_names = [item.strip() for item in header_row[2:] if item.strip()]
+    return marker_names, data_rate, num_frames
+
+
+def read_trc_header(path: str) -> Tuple[List[str], float, int]:
+    """
+    Read only the header of a TRC file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the TRC file.
+
+    Returns
+    -------
+    marker_names : List[str]
+        Marker names in column order (e.g. 'Head', 'Left_wrist').
+    frame_rate : float
+        Data rate (FPS) from the file header.
+    num_frames : int
+        Number of frames.
+    """
+    with open(path, 'rb') as f:
+        return _parse_trc_header(f)
+
+
+def read_trc_positions(
+    path: str,
+    joints: Optional[Sequence[str]] = None,
+    dtype: np.dtype = np.float32,
+) -> Tuple[np.ndarray, Dict[str, int], float, int]:
+    """
+    Read TRC marker positions into a single (T, J, 3) array.
+
+    The file is opened once and the numeric block is parsed in a single
+    C-level pass. Only the columns of the requested markers are parsed,
+    which is much cheaper than loading every marker when a metric needs
+    two or three.
+
+    Parameters
+    ----------
+    path : str
+        Path to the TRC file.
+    joints : Sequence[str], optional
+        Marker names to load, in the desired order. By default all
+        markers in the file.
+    dtype : np.dtype, optional
+        dtype of the positions, by default float32. Positions are in mm
+        and the metrics need far less than float32 precision.
+
+    Returns
+    -------
+    positions : np.ndarray, shape (T, J, 3)
+        Contiguous marker positions.
+    joint_index : Dict[str, int]
+        Mapping from marker name to its index along axis 1.
+    frame_rate : float
+        Data rate (FPS) from the file header.
+    num_frames : int
+        Number of frames.
+    """
+    with open(path, 'rb') as f:
+        marker_names, data_rate, num_frames = _parse_trc_header(f)
+        if joints is None:
+            joints = marker_names
+
+        # Frame# and Time come first; marker k occupies columns 2+3k .. 4+3k
+        marker_col = {name: 2 + 3 * k for k, name in enumerate(marker_names)}
+        missing = [name for name in joints if name not in marker_col]
+        if missing:
+            raise KeyError(f"Markers not found in {path}: {missing}")
+
+        usecols = [marker_col[name] + axis for name in joints for axis in range(3)]
+        data_offset = f.tell()
+        try:
+            # One C-level pass over the remaining bytes of the same handle
+            data = np.loadtxt(
+                f, delimiter='\t', usecols=usecols, ndmin=2, dtype=dtype
+            )
+        except ValueError:
+            # Gaps in the export (empty cells); pandas reads them as NaN
+            f.seek(data_offset)
+            df = pd.read_csv(f, sep='\t', header=None, usecols=usecols)
+            # usecols is unordered, so select the columns in the requested order
+            data = df[usecols].to_numpy(dtype=dtype)
+
+    positions = np.ascontiguousarray(data.reshape(len(data), len(joints), 3))
+    joint_index = {name: j for j, name in enumerate(joints)}
+    return positions, joint_index, data_rate, num_frames
+
+
+def read_trc_positions_cached(
+    path: str,
+    joints: Optional[Sequence[str]] = None,
+    cache_dir: Optional[str] = None,
+) -> Tuple[np.ndarray, Dict[str, int], float, int]:
+    """
+    Read TRC marker positions through a memory-mapped float32 cache.
+
+    The first call parses the TRC file (only the requested markers, see
+    `read_trc_positions`) and stores the (T, J, 3) float32 positions as a
+    raw binary file plus a small JSON sidecar (frame rate, marker names,
+    shape, and the TRC modification time and size) under `cache_dir`.
+    Later calls memory-map that file read-only, so no parsing or copying
+    happens and repeated runs are served from the OS page cache.
+
+    There is one entry per TRC path and marker selection. When the TRC
+    file changes, its entry is rewritten in place, so edited files do not
+    leave stale entries behind. To bypass the cache, call
+    `read_trc_positions` instead.
+
+    Parameters
+    ----------
+    path : str
+        Path to the TRC file.
+    joints : Sequence[str], optional
+        Marker names to load, in the desired order. By default all
+        markers in the file.
+    cache_dir : str, optional
+        Cache directory, by default `TRC_CACHE_DIR`.
+
+    Returns
+    -------
+    positions : np.ndarray, shape (T, J, 3)
+        float32 marker positions (a read-only `np.memmap` on cache hits).
+    joint_index : Dict[str, int]
+        Mapping from marker name to its index along axis 1.
+    frame_rate : float
+        Data rate (FPS) from the file header.
+    num_frames : int
+        Number of frames.
+    """
+    if cache_dir is None:
+        cache_dir = TRC_CACHE_DIR
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    selection = '\0'.join(joints) if joints is not None else '*'
+    key = hashlib.sha1(f"{path}\0{selection}".encode()).hexdigest()
+    bin_path = os.path.join(cache_dir, key + ".f32")
+    meta_path = os.path.join(cache_dir, key + ".json")
+
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta['mtime_ns'] == st.st_mtime_ns and meta['size'] == st.st_size:
+            positions = np.memmap(
+                bin_path, dtype=np.float32, mode='r', shape=tuple(meta['shape'])
+            )
+            joint_index = {name: j for j, name in enumerate(meta['joint_names'])}
+            return positions, joint_index, meta['frame_rate'], meta['num_frames']
+    except (OSError, ValueError, KeyError):
+        # No (usable) cache entry yet
+        pass
+
+    positions, joint_index, data_rate, num_frames = read_trc_positions(
+        path, joints=joints, dtype=np.float32
+    )
+    meta = {
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'frame_rate': data_rate,
+        'num_frames': num_frames,
+        'joint_names': list(joint_index),
+        'shape': list(positions.shape),
+    }
+    # Binary first, sidecar last: a sidecar implies a complete binary
+    if write_cache_file(bin_path, positions.tofile):
+        write_cache_file(meta_path, lambda f: json.dump(meta, f), mode='w')
+    return positions, joint_index, data_rate, num_frames
+
+
+def read_trc(
+    path: str,
+    dtype: np.dtype = np.float32,
+) -> Tuple[Dict[str, np.ndarray], float, int]:
     """
     Read a TRC file and return a dictionary of joint positions.
 
+    Thin wrapper around `read_trc_positions` kept for existing callers;
+    the values are views into one (T, J, 3) array.
+
     Parameters
     ----------
     path : str
         Path to the TRC file.
+    dtype : np.dtype, optional
+        dtype of the positions, by default float32.
 
     Returns
     -------
@@ -69,75 +285,69 @@ def read_trc(path: str) -> Tuple[Dict[str, np.ndarray], float, int]:
     num_frames : int
         Number of frames.
     """
-    with open(path, 'r') as f:
-        header_lines = [next(f) for _ in range(5)]
+    positions, joint_index, data_rate, num_frames = read_trc_positions(
+        path, dtype=dtype
+    )
+    joints_dict = {name: positions[:, j] for name, j in joint_index.items()}
+    return joints_dict, data_rate, num_frames
 
-    # Line 3 contains metadata (DataRate, CameraRate, NumFrames, etc.)
-    meta_info = header_lines[2].strip().split('\t')
-    try:
-        data_rate = float(meta_info[0])
-        num_frames = int(meta_info[2])
-    except (ValueError, IndexError):
-        # Fallback if tab splitting fails or format slightly differs
-        # Try splitting by whitespace
-        meta_info = header_lines[2].strip().split()
-        data_rate = float(meta_info[0])
-        num_frames = int(meta_info[2])
 
-    # Line 4 contains marker names
-    # Format: Frame# Time reference ... Marker1 ... Marker2 ...
-    # Markers usually have 3 columns (X, Y, Z) but the name only appears once
-    header_row = header_lines[3].strip().split('\t')
-    
-    # Find marker names and their starting column indices
-    # Usually, columns 0 and 1 are Frame# and Time. Markers start around col 2.
-    # Valid marker names are non-empty strings that are not "Frame#", "Time", etc.
-    marker_names = []
-    col_indices = []
-    
-    # Skip first two columns (Frame#, Time)
-    current_col = 2
-    for item in header_row[2:]:
-        if item and item.strip():
-            marker_names.append(item.strip())
-            col_indices.append(current_col)
-            # Each marker typically takes 3 columns (X, Y, Z)
-            current_col += 3
-        else:
-            # Empty columns between markers? Or X/Y/Z subheaders?
-            # In standard TRC, the header row has empty tabs for Y and Z columns of a marker
-            current_col += 1
-            
-    # Load data starting from line 6 (0-indexed line 5 is subheader X1 Y1 Z1...)
-    # Pandas is robust for this
-    df = pd.read_csv(path, sep='\t', skiprows=5, header=None)
-    
-    # If pandas read extra empty columns at the end, drop them
-    df = df.dropna(axis=1, how='all')
-    
-    data = df.values
-    joints_dict = {}
-    
-    # Re-scan col_indices based on marker_names and the logic that each has 3 columns
-    # We assume the markers appear in order in the file corresponding to the names we found
-    
-    # Better approach: Identify columns by skipping Frame# and Time
-    # Frame# is col 0, Time is col 1
-    # Markers start at col 2.
-    
-    # Let's manually map names to columns assuming 3 cols per marker
-    # The list 'marker_names' should correspond to blocks of 3 columns
-    
-    current_data_col = 2
-    for name in marker_names:
-        # Extract 3 columns
-        if current_data_col + 3 <= data.shape[1]:
-            joints_dict[name] = data[:, current_data_col : current_data_col + 3]
-            current_data_col += 3
-        else:
-            break
-            
-    return joints_dict, data_rate, num_frames
+# Joints used by the position-based metrics: role -> (preferred name,
+# substring groups). A key matches the groups if, for every group, it
+# contains at least one of the group's substrings (case-insensitive).
+DEFAULT_JOINT_QUERIES: Dict[str, Tuple[str, Tuple[Tuple[str, ...], ...]]] = {
+    'head': ('Head', (('head',),)),
+    'right_hand': ('Right_hand', (('right',), ('hand', 'wrist'))),
+    'left_hand': ('Left_hand', (('left',), ('hand', 'wrist'))),
+}
+
+
+def resolve_joint_names(
+    names: Sequence[str],
+    queries: Optional[Dict[str, Tuple[str, Sequence[Sequence[str]]]]] = None,
+) -> Dict[str, str]:
+    """
+    Map metric roles (head, hands) to the marker names used in a file.
+
+    Marker naming differs between exports ('Right_hand', 'RightHand',
+    'Right_wrist', ...). Each role resolves to its preferred name if
+    present (case-insensitive), otherwise to the first name matching its
+    substring groups. Names are lowercased once per call.
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        Marker names in the file (e.g. from `read_trc_header`).
+    queries : Dict[str, Tuple[str, Sequence[Sequence[str]]]], optional
+        Role -> (preferred name, substring groups), by default
+        `DEFAULT_JOINT_QUERIES`.
+
+    Returns
+    -------
+    resolved : Dict[str, str]
+        Role -> marker name. Roles without any match map to their
+        preferred name, which is then absent from `names`.
+    """
+    if queries is None:
+        queries = DEFAULT_JOINT_QUERIES
+
+    lower_to_name: Dict[str, str] = {}
+    for name in names:
+        lower_to_name.setdefault(name.lower(), name)
+
+    resolved = {}
+    for role, (preferred, groups) in queries.items():
+        match = lower_to_name.get(preferred.lower())
+        if match is None:
+            match = next(
+                (
+                    name for lower, name in lower_to_name.items()
+                    if all(any(sub in lower for sub in group) for group in groups)
+                ),
+                preferred,
+            )
+        resolved[role] = match
+    return resolved
 
 
 def read_smpl_npz(path: str) -> Tuple[np.ndarray, np.ndarray]:
@@ -85,20 +85,24 @@ def _motion_speed_per_beat(
     frame_times = np.arange(T) * frame_time
     beat_frames = np.searchsorted(frame_times, beat_times).astype(int)
 
-    speeds = []
-    for i in range(len(beat_frames) - 1):
-        start = beat_frames[i]
-        end = beat_frames[i + 1]
-        # kinetic_vel has length T-1, so clip indices
-        start = max(0, min(start, kinetic_vel.shape[0] - 1))
-        end = max(start + 1, min(end, kinetic_vel.shape[0]))
+    n_vel = kinetic_vel.shape[0]
+    if n_vel == 0 or len(beat_frames) < 2:
+        return np.zeros(0, dtype=np.float32)
 
-        segment = kinetic_vel[start:end]
-        if segment.size == 0 or np.isnan(segment).any():
-            continue
-        speeds.append(np.mean(segment))
+    # kinetic_vel has length T-1, so clip indices
+    starts = np.maximum(np.minimum(beat_frames[:-1], n_vel - 1), 0)
+    ends = np.maximum(starts + 1, np.minimum(beat_frames[1:], n_vel))
 
-    return np.asarray(speeds, dtype=np.float32)
+    # Segment means from prefix sums (in float64); segments containing
+    # NaN are dropped, as before
+    nan_mask = np.isnan(kinetic_vel)
+    filled = np.where(nan_mask, 0.0, kinetic_vel)
+    csum = np.concatenate(([0.0], np.cumsum(filled, dtype=np.float64)))
+    cnan = np.concatenate(([0], np.cumsum(nan_mask)))
+    valid = (cnan[ends] - cnan[starts]) == 0
+    speeds = (csum[ends] - csum[starts])[valid] / (ends - starts)[valid]
+
+    return speeds.astype(np.float32)
 
 
 def compute_jo_ha_kyu_from_bvh_and_audio(
@@ -106,6 +110,7 @@ def compute_jo_ha_kyu_from_bvh_and_audio(
     audio_path: str,
     smooth_sigma: float = 5.0,
     fps_madmom: int = 100,
+    beat_times: Optional[np.ndarray] = None,
 ) -> JoHaKyuResult:
     """
     Compute the Jo–Ha–Kyu score for a single motion/audio pair using BVH.
@@ -121,6 +126,9 @@ def compute_jo_ha_kyu_from_bvh_and_audio(
         by default 5.
     fps_madmom : int, optional
         Frame rate used by Madmom's DBN beat tracker, by default 100.
+    beat_times : np.ndarray, optional
+        Precomputed beat times (seconds) for `audio_path`. If given, beat
+        tracking is skipped; useful when several metrics share one clip.
 
     Returns
     -------
@@ -128,7 +136,8 @@ def compute_jo_ha_kyu_from_bvh_and_audio(
         Contains the Pearson correlation r, p-value, and the aligned
         tempo and motion-speed sequences used for the computation.
     """
-    data, fs_str, _ = bvh_utils.bvhreader(bvh_path)
+    # float32 is plenty for frame-to-frame speeds and halves memory traffic
+    data, fs_str, _ = bvh_utils.bvhreader(bvh_path, dtype=np.float32)
     try:
         frame_time = float(fs_str)
     except ValueError:
@@ -138,7 +147,8 @@ def compute_jo_ha_kyu_from_bvh_and_audio(
     # Use all channels after the first 3 (root translation) as motion
     motion_channels = data[:, 3:]
 
-    beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
+    if beat_times is None:
+        beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
     tempo, _ = tempo_utils.tempo_and_diff_from_beats(beat_times)
 
     motion_speeds = _motion_speed_per_beat(
@@ -16,7 +16,7 @@ The basic idea:
 
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 from sklearn.decomposition import PCA
@@ -24,27 +24,18 @@ from sklearn.decomposition import PCA
 from . import tempo_utils
 
 
-def calculate_curvature_percentage(positions: np.ndarray) -> float:
-    """
-    Calculate curvature percentage of a 3D trajectory using PCA + sagitta.
+def _as_float(positions: np.ndarray) -> np.ndarray:
+    """Positions as floats, keeping float32 input in float32."""
+    return np.asarray(positions, dtype=np.result_type(positions, np.float32))
 
-    Parameters
-    ----------
-    positions : np.ndarray, shape (T, 3)
-        3D positions of a single joint over time.
 
-    Returns
-    -------
-    curvature_percentage : float
-        Sagitta-based curvature percentage in [0, +inf). NaN if degenerate.
+def _curvature_percentage_pca(positions: np.ndarray) -> float:
     """
-    if positions.ndim != 2 or positions.shape[1] != 3:
-        raise ValueError("positions must have shape (T, 3).")
-
-    if positions.shape[0] < 3:
-        return float("nan")
+    Per-segment sklearn PCA + sagitta curvature (the original implementation).
 
-    # Project to 2D PCA plane
+    Only used by `_curvature_percentages` for segments whose start and end
+    points coincide (e.g. held poses), to keep their original scoring.
+    """
     pca = PCA(n_components=2)
     motion_2d = pca.fit_transform(positions)
     x = motion_2d[:, 0]
@@ -55,19 +46,103 @@ def calculate_curvature_percentage(positions: np.ndarray) -> float:
     B = x[0] - x[-1]
     C = x[-1] * y[0] - x[0] * y[-1]
 
-    # Distances of all points to the line
     denom = np.sqrt(A * A + B * B)
     if denom == 0.0:
         return float("nan")
 
     distances = np.abs(A * x + B * y + C) / denom
-    max_distance = np.max(distances)
     total_height = np.linalg.norm(motion_2d[0] - motion_2d[-1])
     if total_height == 0.0:
         return float("nan")
+    return float(np.max(distances) / total_height * 100.0)
+
+
+def _curvature_percentages(
+    segments: np.ndarray,
+    lengths: np.ndarray,
+) -> np.ndarray:
+    """
+    Batched PCA + sagitta curvature for zero-padded trajectory segments.
+
+    Parameters
+    ----------
+    segments : np.ndarray, shape (S, L, 3)
+        Segment positions; only the first `lengths[s]` frames of segment
+        `s` are used.
+    lengths : np.ndarray, shape (S,)
+        Number of valid frames in each segment.
+
+    Returns
+    -------
+    curvature_percentage : np.ndarray, shape (S,)
+        Curvature percentage per segment. NaN if degenerate.
+    """
+    S, L, _ = segments.shape
+    mask = np.arange(L)[None, :] < lengths[:, None]
+    # Keep the arithmetic in the dtype of the positions (float32 or float64)
+    n = np.maximum(lengths, 1).astype(segments.dtype)[:, None]
+
+    # PCA plane of each segment: the top two eigenvectors of its covariance
+    seg = np.where(mask[:, :, None], segments, 0.0)
+    mean = seg.sum(axis=1) / n
+    centered = np.where(mask[:, :, None], seg - mean[:, None, :], 0.0)
+    cov = np.einsum("slj,slk->sjk", centered, centered)
+    _, eigvecs = np.linalg.eigh(cov)
+    plane = eigvecs[:, :, 1:]  # (S, 3, 2), eigenvalues in ascending order
+
+    # Project relative to the first point, so the start-end line passes
+    # through the origin of the plane
+    rel = seg - seg[:, :1, :]
+    motion_2d = np.matmul(rel, plane)  # (S, L, 2)
+    last = motion_2d[np.arange(S), np.maximum(lengths - 1, 0)]  # (S, 2)
+
+    # Distance of every point to the start-end line, normalized by the
+    # start-end distance (the sagitta ratio)
+    total_height = np.hypot(last[:, 0], last[:, 1])
+    cross = np.abs(
+        last[:, None, 0] * motion_2d[:, :, 1]
+        - last[:, None, 1] * motion_2d[:, :, 0]
+    )
+    max_distance = np.where(mask, cross, 0.0).max(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curvature_percentage = max_distance / (total_height * total_height) * 100.0
+    curvature_percentage[lengths < 3] = np.nan
+
+    # Segments that end where they start (held poses): the start-end line
+    # is undefined, and the original per-segment PCA scores them from its
+    # rounding residue. Re-run it on these (rare) segments so that scores
+    # stay identical to the published implementation.
+    for s in np.flatnonzero((lengths >= 3) & (total_height == 0.0)):
+        curvature_percentage[s] = _curvature_percentage_pca(
+            segments[s, : lengths[s]]
+        )
+    return curvature_percentage
+
+
+def calculate_curvature_percentage(positions: np.ndarray) -> float:
+    """
+    Calculate curvature percentage of a 3D trajectory using PCA + sagitta.
+
+    Parameters
+    ----------
+    positions : np.ndarray, shape (T, 3)
+        3D positions of a single joint over time.
+
+    Returns
+    -------
+    curvature_percentage : float
+        Sagitta-based curvature percentage in [0, +inf). NaN if degenerate.
+    """
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError("positions must have shape (T, 3).")
+
+    if positions.shape[0] < 3:
+        return float("nan")
 
-    curvature_percentage = (max_distance / total_height) * 100.0
-    return float(curvature_percentage)
+    segments = _as_float(positions)[None]
+    lengths = np.array([positions.shape[0]])
+    return float(_curvature_percentages(segments, lengths)[0])
 
 
 def s_curve_score_from_positions(
@@ -88,6 +163,7 @@ def s_curve_score_from_positions(
 
     The final score is the mean of these indicator values across all
     valid segments, consistent with the definition in the paper.
+    All segments are processed in one batched pass.
 
     Parameters
     ----------
@@ -112,29 +188,72 @@ def s_curve_score_from_positions(
     if positions.ndim != 2 or positions.shape[1] != 3:
         raise ValueError("positions must have shape (T, 3).")
 
-    T = positions.shape[0]
+    scores = s_curve_scores_from_joints(
+        positions[:, None, :], beat_times, fps, min_pct=min_pct, max_pct=max_pct
+    )
+    return float(scores[0])
+
+
+def s_curve_scores_from_joints(
+    positions: np.ndarray,
+    beat_times: np.ndarray,
+    fps: float,
+    min_pct: float = 20.0,
+    max_pct: float = 60.0,
+) -> np.ndarray:
+    """
+    S-curve scores for several joints that share the same beat segments.
+
+    Same as calling `s_curve_score_from_positions` per joint, but the
+    segments of all joints are gathered and scored in a single batched
+    pass over the positions.
+
+    Parameters
+    ----------
+    positions : np.ndarray, shape (T, J, 3)
+        3D positions of J joints.
+    beat_times : np.ndarray, shape (n_beats,)
+        Beat times in seconds.
+    fps : float
+        Frame rate of the motion (frames per second).
+    min_pct, max_pct : float
+        Desirable curvature percentage range.
+
+    Returns
+    -------
+    scores : np.ndarray, shape (J,)
+        Mean indicator score per joint. NaN where no segment is valid.
+    """
+    if positions.ndim != 3 or positions.shape[2] != 3:
+        raise ValueError("positions must have shape (T, J, 3).")
+
+    T, J, _ = positions.shape
+    scores = np.full(J, np.nan)
     frame_times = np.arange(T) / float(fps)
     beat_frames = np.searchsorted(frame_times, beat_times).astype(int)
-
-    values = []
-    for i in range(len(beat_frames) - 1):
-        start = beat_frames[i]
-        end = beat_frames[i + 1]
-        start = max(0, min(start, T - 2))
-        end = max(start + 1, min(end, T))
-
-        segment = positions[start:end]
-        curvature = calculate_curvature_percentage(segment)
-        if np.isnan(curvature):
-            continue
-        if min_pct <= curvature <= max_pct:
-            values.append(1.0)
-        else:
-            values.append(0.0)
-
-    if not values:
-        return float("nan")
-    return float(np.mean(values))
+    if T < 3 or len(beat_frames) < 2:
+        # Every segment would have fewer than 3 frames
+        return scores
+
+    starts = np.maximum(np.minimum(beat_frames[:-1], T - 2), 0)
+    ends = np.maximum(starts + 1, np.minimum(beat_frames[1:], T))
+    lengths = ends - starts
+    S = len(lengths)
+
+    # Gather all segments of all joints into one zero-padded (J*S, L, 3) block
+    offsets = np.arange(lengths.max())
+    frame_idx = np.minimum(starts[:, None] + offsets[None, :], T - 1)
+    segments = _as_float(positions)[frame_idx]  # (S, L, J, 3)
+    segments = segments.transpose(2, 0, 1, 3).reshape(J * S, -1, 3)
+
+    curvature = _curvature_percentages(segments, np.tile(lengths, J))
+    curvature = curvature.reshape(J, S)
+    valid = ~np.isnan(curvature)
+    desirable = valid & (curvature >= min_pct) & (curvature <= max_pct)
+    n_valid = valid.sum(axis=1)
+    has_valid = n_valid > 0
+    scores[has_valid] = desirable.sum(axis=1)[has_valid] / n_valid[has_valid]
+    return scores
 
 
 def s_curve_scores_head_and_hand(
@@ -183,12 +302,17 @@ def s_curve_scores_from_audio_and_positions(
     fps_madmom: int = 100,
     min_pct: float = 20.0,
     max_pct: float = 60.0,
+    beat_times: Optional[np.ndarray] = None,
 ) -> Tuple[float, float]:
     """
     High-level helper that extracts beat times from audio and then
     computes S-curve scores for head and hand.
+
+    If `beat_times` is given, it is used instead of running beat tracking
+    on `audio_path` again.
     """
-    beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
+    if beat_times is None:
+        beat_times = tempo_utils.get_beat_times(audio_path, fps=fps_madmom)
     return s_curve_scores_head_and_hand(
         head_positions=head_positions,
         hand_positions=hand_positions,
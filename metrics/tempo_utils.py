@@ -10,31 +10,245 @@ pipelines while staying consistent with the paper and appendix.
 
 from __future__ import annotations
 
-from typing import Tuple
+import functools
+import hashlib
+import io
+import os
+from typing import Optional, Tuple, Union
 
 import madmom
 import numpy as np
+from scipy.io import wavfile
 
+from .cache_utils import write_cache_file
 
-def get_beat_times(audio_path: str, fps: int = 100) -> np.ndarray:
+
+# Default on-disk location of cached beat times (see `get_beat_times`)
+BEAT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "tempo_changing_music2motion", "beats"
+)
+
+# Part of every beat cache file name; bump it whenever the beat tracking
+# setup (processors or their parameters) changes, so that stale results
+# are not served
+BEAT_CACHE_VERSION = 1
+
+# Where beat times came from (see `get_beat_times_with_source`)
+BEATS_FROM_SIDECAR = "sidecar"
+BEATS_FROM_CACHE = "cache"
+BEATS_FROM_TRACKER = "tracker"
+
+
+@functools.lru_cache(maxsize=8)
+def get_beat_processors(fps: int = 100) -> Tuple[
+    madmom.features.beats.RNNBeatProcessor,
+    madmom.features.beats.DBNBeatTrackingProcessor,
+]:
+    """
+    Madmom RNN activation and DBN decoding processors, built once per fps.
+
+    Constructing the processors loads the RNN models and builds the DBN
+    state space, which is expensive. Both are stateless in offline mode,
+    so the same instances are reused by every beat-tracking call.
+
+    Parameters
+    ----------
+    fps : int, optional
+        Frame rate for the DBN beat tracker, by default 100.
+
+    Returns
+    -------
+    (rnn, dbn) : Tuple[RNNBeatProcessor, DBNBeatTrackingProcessor]
+        Beat activation and beat decoding processors.
+    """
+    rnn = madmom.features.beats.RNNBeatProcessor()
+    dbn = madmom.features.beats.DBNBeatTrackingProcessor(fps=fps)
+    return rnn, dbn
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode an in-memory WAV file.
+
+    Parameters
+    ----------
+    data : bytes
+        Contents of a WAV file.
+
+    Returns
+    -------
+    samples : np.ndarray, shape (n_samples,) or (n_samples, n_channels)
+        Samples in the file's own dtype (e.g., int16).
+    sample_rate : int
+        Sample rate in Hz.
+    """
+    sample_rate, samples = wavfile.read(io.BytesIO(data))
+    return samples, sample_rate
+
+
+def _track_beats(audio_path: str, data: bytes, fps: int) -> np.ndarray:
+    """Run Madmom on already-read file contents."""
+    try:
+        samples, sample_rate = decode_wav(data)
+    except ValueError:
+        # Not a WAV file scipy can parse; let Madmom load it from disk
+        rnn, dbn = get_beat_processors(fps)
+        return dbn(rnn(audio_path))
+    return get_beat_times_from_signal(samples, sample_rate, fps=fps)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_beat_times(
+    audio_path: str, mtime_ns: int, size: int, fps: int, cache_dir: Optional[str]
+) -> Tuple[np.ndarray, str]:
+    # mtime_ns and size only key the in-process cache; the disk cache (if
+    # any) is keyed by the file contents and the tracker version
+    with open(audio_path, "rb") as f:
+        data = f.read()
+
+    if cache_dir is None:
+        beat_times = _track_beats(audio_path, data, fps)
+        beat_times.setflags(write=False)
+        return beat_times, BEATS_FROM_TRACKER
+
+    digest = hashlib.sha1(data).hexdigest()
+    madmom_version = getattr(madmom, "__version__", "unknown")
+    cache_path = os.path.join(
+        cache_dir,
+        f"{digest}_fps{fps}_madmom{madmom_version}_v{BEAT_CACHE_VERSION}.npy",
+    )
+    if os.path.exists(cache_path):
+        beat_times = np.load(cache_path)
+        source = BEATS_FROM_CACHE
+    else:
+        beat_times = _track_beats(audio_path, data, fps)
+        source = BEATS_FROM_TRACKER
+        write_cache_file(cache_path, lambda f: np.save(f, beat_times))
+
+    # Shared between callers through the in-memory cache
+    beat_times.setflags(write=False)
+    return beat_times, source
+
+
+def beats_sidecar_path(audio_path: str) -> str:
+    """Path of the precomputed-beats sidecar (clip.wav -> clip.beats.npy)."""
+    return os.path.splitext(audio_path)[0] + ".beats.npy"
+
+
+def get_beat_times_with_source(
+    audio_path: str,
+    fps: int = 100,
+    cache_dir: Union[str, bool, None] = None,
+) -> Tuple[np.ndarray, str]:
     """
     Extract beat times (in seconds) from an audio file using Madmom.
 
+    If a sidecar file with precomputed beat times exists next to the
+    audio (`clip.beats.npy` for `clip.wav`, see `beats_sidecar_path`),
+    it is loaded and Madmom is not run at all.
+
+    Otherwise, since beat tracking is deterministic in the audio contents
+    and `fps` and is by far the most expensive step of the metrics,
+    results are cached at two levels:
+
+    - in process, keyed by (path, mtime, size, fps);
+    - on disk, as `<sha1 of the file>_fps<fps>_madmom<version>_v<n>.npy`
+      under `cache_dir`, where `n` is `BEAT_CACHE_VERSION`.
+
+    The audio file is read once; on a cache miss the same bytes are
+    decoded and handed to Madmom.
+
+    Parameters
+    ----------
+    audio_path : str
+        Path to an audio file (e.g., WAV).
+    fps : int, optional
+        Frame rate for the DBN beat tracker, by default 100.
+    cache_dir : str or False, optional
+        Directory for the on-disk cache, by default `BEAT_CACHE_DIR`.
+        False disables the on-disk cache (nothing is written).
+
+    Returns
+    -------
+    beat_times : np.ndarray, shape (n_beats,)
+        Beat times in seconds (read-only unless loaded from a sidecar).
+    source : str
+        `BEATS_FROM_SIDECAR`, `BEATS_FROM_CACHE` (disk cache hit) or
+        `BEATS_FROM_TRACKER` (Madmom was run). Repeated calls in the same
+        process report the source of the first one.
+    """
+    sidecar_path = beats_sidecar_path(audio_path)
+    if os.path.exists(sidecar_path):
+        return np.load(sidecar_path), BEATS_FROM_SIDECAR
+
+    if cache_dir is None:
+        cache_dir = BEAT_CACHE_DIR
+    elif cache_dir is False:
+        cache_dir = None
+    audio_path = os.path.abspath(audio_path)
+    st = os.stat(audio_path)
+    return _cached_beat_times(
+        audio_path, st.st_mtime_ns, st.st_size, int(fps), cache_dir
+    )
+
+
+def get_beat_times(
+    audio_path: str,
+    fps: int = 100,
+    cache_dir: Union[str, bool, None] = None,
+) -> np.ndarray:
+    """
+    Extract beat times (in seconds) from an audio file using Madmom.
+
+    Same as `get_beat_times_with_source`, without the source.
+
     Parameters
     ----------
     audio_path : str
         Path to an audio file (e.g., WAV).
     fps : int, optional
         Frame rate for the DBN beat tracker, by default 100.
+    cache_dir : str or False, optional
+        Directory for the on-disk cache, by default `BEAT_CACHE_DIR`.
+        False disables the on-disk cache (nothing is written).
+
+    Returns
+    -------
+    beat_times : np.ndarray, shape (n_beats,)
+        Beat times in seconds (read-only unless loaded from a sidecar).
+    """
+    return get_beat_times_with_source(audio_path, fps=fps, cache_dir=cache_dir)[0]
+
+
+def get_beat_times_from_signal(
+    samples: np.ndarray,
+    sample_rate: int,
+    fps: int = 100,
+) -> np.ndarray:
+    """
+    Extract beat times (in seconds) from already-decoded audio samples.
+
+    Same as `get_beat_times`, for callers that have read the audio file
+    themselves (see `decode_wav`). The samples go through Madmom's
+    usual down-mixing and resampling.
+
+    Parameters
+    ----------
+    samples : np.ndarray, shape (n_samples,) or (n_samples, n_channels)
+        Audio samples as stored in the file (e.g., int16 PCM).
+    sample_rate : int
+        Sample rate of `samples` in Hz.
+    fps : int, optional
+        Frame rate for the DBN beat tracker, by default 100.
 
     Returns
     -------
     beat_times : np.ndarray, shape (n_beats,)
         Beat times in seconds.
     """
-    proc = madmom.features.beats.DBNBeatTrackingProcessor(fps=fps)
-    act = madmom.features.beats.RNNBeatProcessor()(audio_path)
-    beat_times = proc(act)
+    signal = madmom.audio.signal.Signal(samples, sample_rate=sample_rate)
+    rnn, dbn = get_beat_processors(fps)
+    beat_times = dbn(rnn(signal))
     return beat_times
 
 